@@ -1,11 +1,121 @@
 import streamlit as st
 import pandas as pd
 import sqlite3
+import threading
 from datetime import datetime
 
 # Database connection
 db_path = "final_bots_db_updated_with_new_docs_corrected.sqlite"
 
+# One connection per thread, kept open for the whole session. Opening and
+# closing the database (and its -wal/-shm files) on every helper call is the
+# dominant cost under Streamlit's rerun-per-interaction model.
+_local = threading.local()
+
+def get_conn() -> sqlite3.Connection:
+    """
+    Returns the thread-local SQLite connection, creating it on first use.
+
+    The connection is configured once with the pragmas the app relies on
+    (WAL journaling, relaxed sync, foreign keys) and is never closed by the
+    helpers; it lives for the lifetime of the server thread.
+
+    Returns:
+        sqlite3.Connection: The cached connection for the current thread.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA busy_timeout=5000")
+        # Dedupe Bot/KnowledgeBase links in the engine so the link helpers
+        # can use INSERT OR IGNORE instead of a SELECT round-trip per row.
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_bkl "
+            "ON BotKnowledgeLink (Bot_ID, KnowledgeBase_ID)"
+        )
+        # Lookups and cascading deletes by Bot_ID use the ix_bkl prefix; the
+        # KnowledgeBase side needs its own index to avoid a full scan.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_bkl_kb "
+            "ON BotKnowledgeLink (KnowledgeBase_ID)"
+        )
+        conn.execute("ANALYZE")
+        _local.conn = conn
+    return conn
+
+
+# The only tables this app manages; every identifier interpolated into SQL
+# must resolve against this set (and the table's actual schema for columns).
+# Keeping the set of valid SQL strings small also means each one stays warm
+# in the connection's prepared-statement cache.
+ALLOWED_TABLES = {"Bots", "KnowledgeBase", "BotKnowledgeLink"}
+
+# The Bots columns the UI actually sorts and filters on. View Records
+# projects only these by default; the cold metadata columns (Prompt,
+# Owner_Maintainer, Foundation_*, Version, Last_Updated, ...) are fetched
+# only when explicitly selected or when the Update form needs the full row,
+# keeping the common read path to a fraction of the row width.
+BOTS_HOT_COLUMNS = ("Bot_ID", "Botperson_Name", "Botperson_Role", "Active_Status", "Total_Interactions")
+
+def _check_identifiers(table_name: str, *columns: str) -> None:
+    """
+    Validates a table name (and optionally column names) before they are
+    interpolated into SQL.
+
+    Args:
+        table_name (str): The table name to validate.
+        *columns (str): Column names to validate against the table's schema.
+
+    Raises:
+        ValueError: If the table or any column is not a known identifier.
+    """
+    if table_name not in ALLOWED_TABLES:
+        raise ValueError(f"Unknown table: {table_name}")
+    if columns:
+        valid = set(get_table_columns(table_name))
+        for col in columns:
+            if col not in valid:
+                raise ValueError(f"Unknown column for {table_name}: {col}")
+
+
+# Fixed-shape statements, hoisted to module level so every call reuses the
+# exact same SQL text and hits the connection's prepared-statement cache
+# instead of re-parsing and re-planning the query.
+SQL_INS_LINK = "INSERT OR IGNORE INTO BotKnowledgeLink (Bot_ID, KnowledgeBase_ID) VALUES (?, ?)"
+SQL_DEL_LINK_BY_BOT = "DELETE FROM BotKnowledgeLink WHERE Bot_ID = ?"
+SQL_DEL_LINK_BY_KB = "DELETE FROM BotKnowledgeLink WHERE KnowledgeBase_ID = ?"
+
+# UPDATE statements vary by column set, so memoize them per shape; a repeated
+# shape then maps to one cached string and one cached prepared statement.
+_update_sql_cache = {}
+
+def _update_sql(table_name: str, columns, id_column: str) -> str:
+    """
+    Builds (and memoizes) the UPDATE statement for a given column set.
+
+    Args:
+        table_name (str): The table being updated.
+        columns: The columns appearing in the SET clause, in order.
+        id_column (str): The column used in the WHERE clause.
+
+    Returns:
+        str: The parameterized UPDATE statement.
+    """
+    key = (table_name, tuple(columns), id_column)
+    sql = _update_sql_cache.get(key)
+    if sql is None:
+        _check_identifiers(table_name, *key[1], id_column)
+        assignments = ', '.join(f"{col} = ?" for col in columns)
+        sql = f"UPDATE {table_name} SET {assignments} WHERE {id_column} = ?"
+        _update_sql_cache[key] = sql
+    return sql
+
 # Streamlit application
 
 st.set_page_config(
@@ -14,42 +124,170 @@ st.set_page_config(
    layout="wide",
    initial_sidebar_state="auto",
 )
-st.image("logo.png", width = 250)
+@st.cache_resource
+def _logo() -> bytes:
+    """Reads the logo once per process instead of on every rerun."""
+    with open("logo.png", "rb") as f:
+        return f.read()
+
+st.image(_logo(), width = 250)
 st.title("Bots Management :robot_face:")
 
+# Per-table version counters used as cache keys, so a write to one table
+# only invalidates that table's cached reads instead of clearing everything.
+def table_version(table_name: str) -> int:
+    """
+    Returns the current cache version for a table.
+
+    Args:
+        table_name (str): The name of the table.
+
+    Returns:
+        int: The version counter, starting at 0.
+    """
+    return st.session_state.get(f"ver_{table_name}", 0)
+
+
+def bump_table_version(table_name: str) -> None:
+    """
+    Invalidates cached reads of a table after a write.
+
+    Args:
+        table_name (str): The name of the mutated table.
+    """
+    st.session_state[f"ver_{table_name}"] = table_version(table_name) + 1
+    # Link rows reference both parent tables, so writes to either parent
+    # invalidate the cached links as well.
+    if table_name in ("Bots", "KnowledgeBase"):
+        st.session_state["ver_BotKnowledgeLink"] = table_version("BotKnowledgeLink") + 1
+
+
+def get_table_columns(table_name: str) -> list:
+    """
+    Returns the column names of a table without loading any rows.
+
+    Args:
+        table_name (str): The name of the table to inspect.
+
+    Returns:
+        list: The column names, in schema order.
+    """
+    if table_name not in ALLOWED_TABLES:
+        raise ValueError(f"Unknown table: {table_name}")
+    conn = get_conn()
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+
+
 # Load data from the SQLite database
-@st.cache_data(ttl=60)
-def load_data(table_name):
-    conn = sqlite3.connect(db_path)
-    query = f"SELECT * FROM {table_name};"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+@st.cache_data(ttl=600)
+def load_data(table_name, columns=None, sort_col=None, ascending=True, limit=None, offset=None, version=0):
+    """
+    Loads rows from a table, pushing projection, sort and paging into SQL
+    so only the data the UI renders leaves SQLite.
+
+    Args:
+        table_name (str): The name of the table to load data from.
+        columns (tuple, optional): Columns to select; all columns if None.
+        sort_col (str, optional): Column to ORDER BY in SQL.
+        ascending (bool): Sort direction when sort_col is given.
+        limit (int, optional): Maximum number of rows to return.
+        offset (int, optional): Number of rows to skip.
+        version (int): The table's cache version; pass table_version(table_name)
+            so writes to the table invalidate its cached reads.
+
+    Returns:
+        pd.DataFrame: The requested slice of the table.
+    """
+    conn = get_conn()
+    # Identifiers cannot be bound as parameters, so validate them against
+    # the actual schema before interpolating.
+    valid_columns = get_table_columns(table_name)
+    selected = [col for col in (columns or valid_columns) if col in valid_columns]
+    query = f"SELECT {', '.join(selected)} FROM {table_name}"
+    params = []
+    if sort_col in valid_columns:
+        query += f" ORDER BY {sort_col} {'ASC' if ascending else 'DESC'}"
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset or 0])
+    df = pd.read_sql_query(query, conn, params=params or None)
     return df
 
 
+@st.cache_data(ttl=600)
+def list_ids(table_name, id_col, version=0):
+    """
+    Returns a table's identifier column as sorted strings for the Delete
+    and Update selectboxes, without a DataFrame/astype round-trip.
+
+    Args:
+        table_name (str): The name of the table.
+        id_col (str): The identifier column to list.
+        version (int): The table's cache version; pass table_version(table_name).
+
+    Returns:
+        list: The identifier values as strings, in ascending order.
+    """
+    _check_identifiers(table_name, id_col)
+    conn = get_conn()
+    return [str(row[0]) for row in conn.execute(f"SELECT {id_col} FROM {table_name} ORDER BY {id_col}")]
+
+
+@st.cache_data(ttl=600)
+def count_rows(table_name, version=0):
+    """
+    Returns the number of rows in a table, cached per table version.
+
+    Args:
+        table_name (str): The name of the table to count.
+        version (int): The table's cache version; pass table_version(table_name).
+
+    Returns:
+        int: The row count.
+    """
+    _check_identifiers(table_name)
+    conn = get_conn()
+    return conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+
+
 # Add a new record to the database
 
-def add_record(data: pd.DataFrame, table_name: str) -> None:
+def add_record(data, table_name: str):
     """
-    Adds a new record to the specified table in the SQLite database.
+    Adds one or more records to the specified table in the SQLite database
+    with a single parameterized INSERT.
 
     Args:
-        data (pd.DataFrame): The data to be added as a new record.
+        data (dict or list): A column-to-value mapping for the new record,
+            or a list of such mappings inserted in one transaction.
         table_name (str): The name of the table where the record will be added.
+
+    Returns:
+        int: The ROWID of the last inserted record, or None on error.
     """
+    rows = data if isinstance(data, list) else [data]
+    if not rows:
+        return None
+    _check_identifiers(table_name, *rows[0].keys())
+    columns = ', '.join(rows[0].keys())
+    placeholders = ', '.join('?' for _ in rows[0])
+    sql = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
     try:
-        conn = sqlite3.connect(db_path)
-        data.to_sql(table_name, conn, if_exists='append', index=False)
-        conn.close()
+        conn = get_conn()
+        with conn:
+            if len(rows) == 1:
+                cursor = conn.execute(sql, tuple(rows[0].values()))
+            else:
+                cursor = conn.executemany(sql, [tuple(row.values()) for row in rows])
+        return cursor.lastrowid
     except sqlite3.IntegrityError as e:
-        st.error("Integrity error:", e)
+        st.error(f"Integrity error: {e}")
     except sqlite3.DatabaseError as e:
-        st.error("Database error:", e)
+        st.error(f"Database error: {e}")
     except Exception as e:
-        st.error("An unexpected error occurred:", e)
+        st.error(f"An unexpected error occurred: {e}")
     finally:
-        conn.close()
-        st.cache_data.clear()  # Clear the cache after adding a record
+        bump_table_version(table_name)  # Invalidate cached reads of this table
 
 
 def delete_record(identifier: int, table_name: str, identifier_column: str) -> None:
@@ -63,30 +301,43 @@ def delete_record(identifier: int, table_name: str, identifier_column: str) -> N
         identifier_column (str): The name of the column to match the identifier against.
     """
     try:
-        conn = sqlite3.connect(db_path)
-        conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraint enforcement
-        cursor = conn.cursor()
-        cursor.execute("BEGIN")  # Start a transaction
-
-        if table_name == "Bots":
-            cursor.execute(f"DELETE FROM BotKnowledgeLink WHERE Bot_ID = ?", (identifier,))
-        elif table_name == "KnowledgeBase":
-            cursor.execute(f"DELETE FROM BotKnowledgeLink WHERE KnowledgeBase_ID = ?", (identifier,))
-
-        cursor.execute(f"DELETE FROM {table_name} WHERE {identifier_column} = ?", (identifier,))
-        conn.commit()  # Commit the transaction
-
+        _check_identifiers(table_name, identifier_column)
+        conn = get_conn()
+        # 'with conn' opens one transaction that commits on success and
+        # rolls back automatically if anything below raises.
+        with conn:
+            if table_name == "Bots":
+                conn.execute(SQL_DEL_LINK_BY_BOT, (identifier,))
+            elif table_name == "KnowledgeBase":
+                conn.execute(SQL_DEL_LINK_BY_KB, (identifier,))
+            conn.execute(f"DELETE FROM {table_name} WHERE {identifier_column} = ?", (identifier,))
     except sqlite3.IntegrityError as e:
-        conn.rollback()  # Rollback the transaction on error
-        st.error("Integrity error:", e)
+        st.error(f"Integrity error: {e}")
     except sqlite3.DatabaseError as e:
-        conn.rollback()  # Rollback the transaction on error
-        st.error("Database error:", e)
+        st.error(f"Database error: {e}")
     except Exception as e:
-        conn.rollback()  # Rollback the transaction on error
-        st.error("An unexpected error occurred:", e)
+        st.error(f"An unexpected error occurred: {e}")
     finally:
-        conn.close()  # Ensure the connection is closed
+        bump_table_version(table_name)  # Invalidate cached reads of this table
+
+
+def _sanitize_values(data: dict) -> dict:
+    """
+    Nulls out empty, "None" and NaN form values before a write.
+
+    Plain scalar checks; pd.notna would go through pandas' generic dispatch
+    once per column. v != v is the NaN test.
+
+    Args:
+        data (dict): A column-to-value mapping from a form.
+
+    Returns:
+        dict: The mapping with empty values replaced by None.
+    """
+    return {
+        k: None if v is None or v == "" or v == "None" or (isinstance(v, float) and v != v) else v
+        for k, v in data.items()
+    }
 
 
 def update_record(record_id: int, data: dict, table_name: str, column_name: str) -> None:
@@ -100,20 +351,39 @@ def update_record(record_id: int, data: dict, table_name: str, column_name: str)
         column_name (str): The name of the column that identifies the record.
     """
     try:
-        conn = sqlite3.connect(db_path)
-        processed_data = {k: v if pd.notna(v) and v != "None" else None for k, v in data.items()}
-        columns = ', '.join([f"{k} = ?" for k in processed_data.keys()])
+        conn = get_conn()
+        processed_data = _sanitize_values(data)
         values = list(processed_data.values())
         values.append(record_id)
-        conn.execute(f"UPDATE {table_name} SET {columns} WHERE {column_name} = ?", values)
-        conn.commit()
+        with conn:
+            conn.execute(_update_sql(table_name, processed_data.keys(), column_name), values)
     except sqlite3.DatabaseError as e:
-        st.error("Database error:", e)
+        st.error(f"Database error: {e}")
     except Exception as e:
-        st.error("An unexpected error occurred:", e)
+        st.error(f"An unexpected error occurred: {e}")
     finally:
-        conn.close()
-        st.cache_data.clear()  # Clear the cache after updating a record
+        bump_table_version(table_name)  # Invalidate cached reads of this table
+
+
+# Static form defaults, built once at import; Last_Updated is the only
+# dynamic default and is computed on demand in get_default_value_for_column.
+DEFAULT_VALUES = {
+    'Bots': {
+        "Total_Interactions": "0",
+        "Positive_Feedback_Count": "0",
+        "Negative_Feedback_Count": "0",
+        "Level_of_Access": "Full",
+        "Active_Status": "Active",
+        "Version": "1.0",
+        "Owner_Maintainer": "Bahrain E-GOV",
+        "Foundation_Business": "Bahrain E-GOV",
+        "Foundation_Name": "Bahrain E-GOV",
+    },
+    'KnowledgeBase': {
+        "Content": "Sample Document",
+        "Metadata": "Sample Metadata"
+    }
+}
 
 
 def get_default_value_for_column(column: str, table_name: str) -> str:
@@ -127,36 +397,57 @@ def get_default_value_for_column(column: str, table_name: str) -> str:
     Returns:
         str: The default value for the column.
     """
-    default_values = {
-        'Bots': {
-            "Total_Interactions": "0",
-            "Positive_Feedback_Count": "0",
-            "Negative_Feedback_Count": "0",
-            "Level_of_Access": "Full",
-            "Active_Status": "Active",
-            "Version": "1.0",
-            "Owner_Maintainer": "Bahrain E-GOV",
-            "Foundation_Business": "Bahrain E-GOV",
-            "Foundation_Name": "Bahrain E-GOV",
-            "Last_Updated": datetime.now().strftime("%Y-%m-%d")
-        },
-        'KnowledgeBase': {
-            "Content": "Sample Document",
-            "Metadata": "Sample Metadata"
-        }
-    }
-    return default_values.get(table_name, {}).get(column, None)
+    if table_name == 'Bots' and column == 'Last_Updated':
+        return datetime.now().strftime("%Y-%m-%d")
+    return DEFAULT_VALUES.get(table_name, {}).get(column, None)
+
+@st.cache_data(ttl=600)
+def get_knowledgebase_entries(version=0):
+    """
+    Loads the KnowledgeBase entries shown in the link multiselects.
 
-def get_knowledgebase_entries():
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query("SELECT ID, Content FROM KnowledgeBase", conn)
-    conn.close()
+    Cached per KnowledgeBase version so form reruns reuse the result, and
+    Content is truncated to the preview length the widget actually renders.
+
+    Args:
+        version (int): The KnowledgeBase cache version; pass
+            table_version("KnowledgeBase").
+
+    Returns:
+        pd.DataFrame: The ID and Content preview of every entry.
+    """
+    conn = get_conn()
+    df = pd.read_sql_query("SELECT ID, substr(Content, 1, 120) AS Content FROM KnowledgeBase", conn)
     return df
 
+
+@st.cache_data(ttl=600)
+def get_kb_options(version=0):
+    """
+    Returns the (ID, Content preview) option tuples for the link
+    multiselects, converted from pandas once per KnowledgeBase version
+    instead of on every form rerun.
+
+    Args:
+        version (int): The KnowledgeBase cache version; pass
+            table_version("KnowledgeBase").
+
+    Returns:
+        tuple: (ID, Content) pairs for every KnowledgeBase entry.
+    """
+    kb_entries = get_knowledgebase_entries(version)
+    return tuple(zip(kb_entries['ID'].tolist(), kb_entries['Content'].tolist()))
+
+
+def _fmt_kb(option):
+    """Renders a KnowledgeBase option as its Content preview."""
+    return option[1]
+
 # Function to add a new Bot record and return its ID
 def add_bot_and_get_id(data):
-    conn = sqlite3.connect(db_path)
+    conn = get_conn()
     try:
+        _check_identifiers("Bots", *data.keys())
         cursor = conn.cursor()
         columns = ', '.join(data.keys())
         placeholders = ', '.join('?' for _ in data)
@@ -167,65 +458,77 @@ def add_bot_and_get_id(data):
     except sqlite3.Error as e:
         st.error(f"An error occurred: {e}")
     finally:
-        conn.close()
-        st.cache_data.clear()  # Clear the cache after updating a record
+        bump_table_version("Bots")  # Invalidate cached reads of this table
 
 
 # Function to link Bot to KnowledgeBase without creating duplicates
 def link_bot_to_knowledgebase(bot_id, kb_ids):
-    conn = sqlite3.connect(db_path)
+    conn = get_conn()
     try:
+        # One batched statement in one transaction; the unique index on
+        # (Bot_ID, KnowledgeBase_ID) makes duplicates a no-op.
         with conn:
-            cursor = conn.cursor()
-            for kb_id in kb_ids:
-                # Check if the link already exists
-                cursor.execute("SELECT * FROM BotKnowledgeLink WHERE Bot_ID=? AND KnowledgeBase_ID=?", (bot_id, kb_id))
-                if cursor.fetchone() is None:
-                    # If not, create the link
-                    cursor.execute("INSERT INTO BotKnowledgeLink (Bot_ID, KnowledgeBase_ID) VALUES (?, ?)", (bot_id, kb_id))
+            conn.executemany(SQL_INS_LINK, [(bot_id, kb_id) for kb_id in kb_ids])
     except sqlite3.Error as e:
         st.error(f"An error occurred: {e}")
     finally:
-        conn.close()
-
-
-def get_linked_knowledgebase_entries(bot_id):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    query = "SELECT KnowledgeBase_ID FROM BotKnowledgeLink WHERE Bot_ID = ?"
-    try:
-        print(f"Executing query: {query} with Bot_ID {bot_id}")
-        cursor.execute(query, (bot_id,))
-        rows = cursor.fetchall()
-        if not rows:
-            print(f"No KnowledgeBase entries linked to Bot_ID {bot_id}")
-        return [row[0] for row in rows]
-    except sqlite3.Error as e:
-        print(f"An error occurred during query execution: {e}")
-        return []
-    finally:
-        conn.close()
-
+        bump_table_version("BotKnowledgeLink")
 
-# Function to update the BotKnowledgeLink table
-def update_bot_knowledge_links(bot_id, kb_ids_selected):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    # Ensure bot_id is an integer
-    bot_id = int(bot_id)
+def get_bot_with_links(bot_id):
+    """
+    Fetches a Bots row together with its linked KnowledgeBase IDs in a
+    single query, instead of a full Bots load plus a separate link lookup.
 
-    # First, delete existing links
-    cursor.execute("DELETE FROM BotKnowledgeLink WHERE Bot_ID=?", (bot_id,))
+    Args:
+        bot_id (int): The Bot_ID to fetch.
 
-    # Then, insert the new links
-    for kb_id in kb_ids_selected:
-        # Ensure kb_id is an integer
-        kb_id = int(kb_id)
-        cursor.execute("INSERT INTO BotKnowledgeLink (Bot_ID, KnowledgeBase_ID) VALUES (?, ?)", (bot_id, kb_id))
+    Returns:
+        tuple: (pd.Series of the bot's columns, list of linked KnowledgeBase
+            IDs), or (None, []) if the bot does not exist.
+    """
+    conn = get_conn()
+    df = pd.read_sql_query(
+        "SELECT b.*, GROUP_CONCAT(l.KnowledgeBase_ID) AS kb_ids "
+        "FROM Bots b LEFT JOIN BotKnowledgeLink l ON l.Bot_ID = b.Bot_ID "
+        "WHERE b.Bot_ID = ? GROUP BY b.Bot_ID",
+        conn,
+        params=(bot_id,),
+    )
+    if df.empty:
+        return None, []
+    row = df.iloc[0]
+    kb_ids = [int(kb_id) for kb_id in row["kb_ids"].split(",")] if row["kb_ids"] else []
+    return row.drop("kb_ids"), kb_ids
+
+
+# Function to update a Bot and its KnowledgeBase links together
+def apply_bot_update(bot_id, data, kb_ids):
+    """
+    Updates a Bots row and rewrites its KnowledgeBase links in a single
+    transaction, so the row update, link delete and link inserts commit
+    (or roll back) as one unit instead of three separate commits.
 
-    conn.commit()
-    conn.close()
+    Args:
+        bot_id (int): The Bot_ID of the record to update.
+        data (dict): A dictionary of the Bots columns to update.
+        kb_ids: The KnowledgeBase IDs the bot should be linked to.
+    """
+    try:
+        conn = get_conn()
+        processed_data = _sanitize_values(data)
+        values = list(processed_data.values())
+        values.append(bot_id)
+        with conn:
+            conn.execute(_update_sql("Bots", processed_data.keys(), "Bot_ID"), values)
+            conn.execute(SQL_DEL_LINK_BY_BOT, (bot_id,))
+            conn.executemany(SQL_INS_LINK, [(bot_id, int(kb_id)) for kb_id in kb_ids])
+    except sqlite3.DatabaseError as e:
+        st.error(f"Database error: {e}")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        bump_table_version("Bots")  # Also bumps the dependent BotKnowledgeLink
 
 
 # Sidebar for user inputs
@@ -240,8 +543,6 @@ else:
     # Allow all actions for other tables
     action = st.sidebar.radio("Action:", ("View Records", "Add Record", "Update Record", "Delete Record"))
 
-df = load_data(table_name)
-
 # Depending on the table, set the identifier column for selecting records
 identifier_column = "Botperson_Name" if table_name == "Bots" else "ID"
 required_columns = {
@@ -256,24 +557,38 @@ if action == "View Records":
     st.sidebar.header("View Settings")
     # Ensure the required column is always selected
     required_column = required_columns[table_name]
-    # Set up the default columns with the required column always included
-    default_columns = [required_column] + [col for col in df.columns.tolist() if col != required_column]
+    # Column choices come from the schema, not from a full table load
+    table_columns = get_table_columns(table_name)
+    # Set up the default columns with the required column always included;
+    # for Bots, default to the hot columns and leave the wide metadata
+    # columns opt-in
+    if table_name == "Bots":
+        default_columns = [col for col in BOTS_HOT_COLUMNS if col in table_columns]
+        if required_column not in default_columns:
+            default_columns.insert(0, required_column)
+    else:
+        default_columns = [required_column] + [col for col in table_columns if col != required_column]
     # Use the multiselect widget with default columns
-    columns_to_show = st.sidebar.multiselect("Select columns to show:", df.columns.tolist(), default=default_columns)
+    columns_to_show = st.sidebar.multiselect("Select columns to show:", table_columns, default=default_columns)
     # Check if the required column is in the selection after the user input
     if required_column not in columns_to_show:
         # If not, add it back to the selection and show a warning
         columns_to_show.insert(0, required_column)
         st.sidebar.warning(f"The '{required_column}' column cannot be removed.")
-    sorted_column = st.sidebar.selectbox("Sort by:", df.columns.tolist())
+    sorted_column = st.sidebar.selectbox("Sort by:", table_columns)
     sort_order = st.sidebar.radio("Sort order:", ("Ascending", "Descending"))
-    # Apply settings
-    df_display = df[columns_to_show]
-    if sort_order == "Ascending":
-        df_display = df_display.sort_values(by=sorted_column)
-    else:
-        df_display = df_display.sort_values(by=sorted_column, ascending=False)
+    # Server-side pagination: only the current page leaves SQLite
+    page_size = st.sidebar.selectbox("Rows per page:", (25, 50, 100, 250), index=1)
+    total_rows = count_rows(table_name, table_version(table_name))
+    total_pages = max(1, -(-total_rows // page_size))
+    page = st.sidebar.number_input("Page:", min_value=1, max_value=total_pages, value=1, step=1)
+    # Projection, sort and paging happen in SQL; only the selected columns
+    # of the current page are loaded
+    df_display = load_data(table_name, tuple(columns_to_show), sorted_column, sort_order == "Ascending",
+                           limit=page_size, offset=(page - 1) * page_size,
+                           version=table_version(table_name))
     st.dataframe(df_display, hide_index = True, use_container_width=True)
+    st.caption(f"Page {page} of {total_pages} ({total_rows} rows)")
 
 
 # Add Record
@@ -283,16 +598,16 @@ elif action == "Add Record":
         required_fields = ["Botperson_Name", "Botperson_Role", "Role", "Usage", "Sector", "Prompt"]
         
         kb_ids_selected = []
-        for col in df.columns:
+        # The form only needs the column names, not the table's rows
+        for col in get_table_columns(table_name):
             if col not in ['Bot_ID', 'ID']:  # Assuming 'ID' or 'Bot_Name' should not be manually entered
                 default_value = get_default_value_for_column(col, table_name)
                 new_data[col] = st.text_input(col, value=default_value)
 
         if table_name == "Bots":
             # Fetch KnowledgeBase entries for linking
-            kb_entries = get_knowledgebase_entries()
-            kb_options = list(zip(kb_entries['ID'], kb_entries['Content']))
-            kb_ids_selected = st.multiselect("Select KnowledgeBase entries to link with the Bot:", options=kb_options, format_func=lambda x: x[1])
+            kb_options = get_kb_options(table_version("KnowledgeBase"))
+            kb_ids_selected = st.multiselect("Select KnowledgeBase entries to link with the Bot:", options=kb_options, format_func=_fmt_kb)
 
         submitted = st.form_submit_button("Add Record")
         if submitted:
@@ -309,16 +624,20 @@ elif action == "Add Record":
                         st.success("Bot linked to KnowledgeBase successfully!")
             else:
                 new_data = {k: v if v != "" else None for k, v in new_data.items()}
-                new_data[identifier_column] = df[identifier_column].max() + 1 if not df.empty else 1  # Auto-increment ID
-                new_df = pd.DataFrame([new_data])
-                add_record(new_df, table_name)
-                st.success("Record added successfully!")
+                # The ID column is left out so SQLite assigns the next ROWID;
+                # computing max()+1 in pandas scanned the whole table and
+                # races under concurrent writers.
+                new_id = add_record(new_data, table_name)
+                if new_id is not None:
+                    st.success(f"Record added successfully! (ID {new_id})")
 
 # Delete Record
 elif action == "Delete Record":
     if table_name == "BotKnowledgeLink":
         identifier_column = 'Bot_ID'
-    record_identifier = st.selectbox(f"Select a {identifier_column} to delete:", [f"Select {identifier_column}"] + df[identifier_column].astype(str).tolist())
+    # Only the identifier values are needed to populate the selectbox
+    record_identifier = st.selectbox(f"Select a {identifier_column} to delete:",
+                                     [f"Select {identifier_column}"] + list_ids(table_name, identifier_column, table_version(table_name)))
     if st.button("Delete Record") and record_identifier != f"Select {identifier_column}":
         delete_record(record_identifier, table_name, identifier_column)
         st.success("Record deleted successfully!")
@@ -326,14 +645,19 @@ elif action == "Delete Record":
 # # Update Record
 elif action == "Update Record":
     # Inside your update section
-    record_identifier = st.selectbox(f"Select a {identifier_column} to update:", [f"Select {identifier_column}"] + df[identifier_column].astype(str).tolist())
+    record_identifier = st.selectbox(f"Select a {identifier_column} to update:",
+                                     [f"Select {identifier_column}"] + list_ids(table_name, identifier_column, table_version(table_name)))
     if record_identifier and record_identifier != f"Select {identifier_column}":
+        # The full rows are only needed once a record has been picked
+        df = load_data(table_name, version=table_version(table_name))
         selected_record = df[df[identifier_column].astype(str) == record_identifier].iloc[0]
-        # print('1:', selected_record)
         bot_id = selected_record['Bot_ID'] if 'Bot_ID' in selected_record else None
-        # print('2:', bot_id)
-        # This should get the existing linked KnowledgeBase IDs for the selected bot
-        linked_kb_ids = get_linked_knowledgebase_entries(bot_id) if bot_id else 'no'
+        linked_kb_ids = []
+        if bot_id:
+            # One JOIN fetches the bot row and its linked KnowledgeBase IDs
+            bot_row, linked_kb_ids = get_bot_with_links(int(bot_id))
+            if bot_row is not None:
+                selected_record = bot_row
         with st.form("Update Record"):
             updated_data = {}
             for col in df.columns:
@@ -342,40 +666,24 @@ elif action == "Update Record":
 
             if table_name == "Bots":
                 # Fetch all KnowledgeBase entries
-                kb_entries = get_knowledgebase_entries()
-                kb_options = list(zip(kb_entries['ID'], kb_entries['Content']))
-                
+                kb_options = get_kb_options(table_version("KnowledgeBase"))
+
                 # Set the default values for the multiselect to be the already linked entries
                 kb_ids_selected = st.multiselect("Select KnowledgeBase entries to link with the Bot:",
                                                 options=kb_options,
                                                 default=[kb_id for kb_id in linked_kb_ids],
-                                                format_func=lambda x: x[1])
+                                                format_func=_fmt_kb)
 
             submitted = st.form_submit_button("Update Record")
             if submitted:
                 updated_data = {k: v if v != "" else None for k, v in updated_data.items()}
-                update_record(record_identifier, updated_data, table_name, identifier_column)
                 if bot_id:
-                    update_bot_knowledge_links(bot_id, [kb_id for kb_id, _ in kb_ids_selected])
+                    # One transaction covers the row update and the link rewrite
+                    apply_bot_update(int(bot_id), updated_data, [kb_id for kb_id, _ in kb_ids_selected])
+                else:
+                    update_record(record_identifier, updated_data, table_name, identifier_column)
                 st.success("Record updated successfully!")
 
 st.divider()
 # Footer
 st.markdown("<p style='text-align: center; font-size: 22px;'>Developed By GoChat247</p>", unsafe_allow_html=True)
-def load_data(table_name: str) -> pd.DataFrame:
-    """
-    Loads data from a specified table in the SQLite database.
-    
-    Args:
-        table_name (str): The name of the table to load data from.
-    
-    Returns:
-        pd.DataFrame: The data from the table as a pandas DataFrame.
-    """
-    try:
-    except sqlite3.DatabaseError as e:
-        st.error(f"Database error: {e}")
-        return pd.DataFrame()
-    except Exception as e:
-        st.error(f"An unexpected error occurred: {e}")
-        return pd.DataFrame()